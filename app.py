@@ -7,9 +7,11 @@ from db import (
     get_analysis_by_id, save_chat, load_chat
 )
 
-from nlp_engine import compare_job_and_resume, suggestion_rules
+from nlp_engine import suggestion_rules
+from result_cache import cached_compare_job_and_resume
 from chat_ui import render_chat_iframe
 from chatbot import chatbot_reply
+from profiling import slow_request
 
 def main():
     st.set_page_config(page_title="Resume Keyword Optimizer", page_icon="🤖", layout="wide")
@@ -111,7 +113,8 @@ def main():
                 jd = (st.session_state["jd_text"] or "").strip()
                 rs = (st.session_state["resume_text"] or "").strip()
                 if jd and rs:
-                    analysis = compare_job_and_resume(jd, rs)
+                    with slow_request("app.analyze", jd=jd, resume=rs):
+                        analysis = cached_compare_job_and_resume(jd, rs)
                     result_text = (
                         f"Job skills: {', '.join(analysis['job_skills'])}\\n"
                         f"Resume skills: {', '.join(analysis['resume_skills'])}\\n"
@@ -146,7 +149,8 @@ def main():
             if (user_msg or "").strip():
                 save_chat(user_id, "user", user_msg)
                 last_analysis = st.session_state.get("last_analysis")
-                bot_msg = chatbot_reply(user_msg, last_analysis, st.session_state.user["id"])  # Pass user_id here
+                with slow_request("app.send", message=user_msg):
+                    bot_msg = chatbot_reply(user_msg, last_analysis, st.session_state.user["id"])  # Pass user_id here
                 save_chat(user_id, "bot", bot_msg)
                 st.rerun()
 
@@ -161,7 +165,7 @@ def main():
                 row = get_analysis_by_id(selected_id)
                 if row:
                     _id, jd, res, res_txt, created_at = row
-                    analysis = compare_job_and_resume(jd, res)
+                    analysis = cached_compare_job_and_resume(jd, res)
                     st.session_state["last_analysis"] = analysis
                     st.success(f"Loaded analysis from {created_at}")
                     st.write("**Job description (preview):**")
@@ -177,7 +181,7 @@ def main():
         if latest:
             _id, jd, res, res_txt, created_at = latest
             st.write(f"**Last saved at:** {created_at}")
-            a = compare_job_and_resume(jd, res)
+            a = cached_compare_job_and_resume(jd, res)
             m1, m2, m3 = st.columns(3)
             m1.metric("Missing", len(a["missing_skills"]))
             m2.metric("Present", len(a["present_skills"]))
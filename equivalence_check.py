@@ -0,0 +1,283 @@
+import os
+import sys
+import gc
+import math
+import time
+import random
+import statistics
+import sqlite3
+import argparse
+import tempfile
+
+import profiling
+import nlp_engine
+import nlp_reference
+import result_cache
+import resume_corpus
+from nlp_engine import STOPWORDS, COMMON_SKILLS, SKILL_SYNONYMS
+
+# ====================== Differential equivalence + perf regression harness ======================
+# Runs the live engine (plus the result cache and resume corpus) against the frozen oracle in nlp_reference.py
+# on generated and real inputs. Exits non-zero on any output difference, or when the live
+# engine is slower than the oracle by more than the configured budget.
+#
+#   python equivalence_check.py [--cases 100] [--seed 0] [--budget 0.15] [--rounds 7]
+
+SAMPLE_JD = """We are looking for a Data Engineer.
+Responsibilities:
+- Build ETL pipelines with Airflow and dbt on AWS (S3, Redshift, Lambda).
+- You will deploy services with Docker, Kubernetes and Terraform; CI/CD via GitHub Actions.
+Requirements: Python, SQL, Spark, Kafka. Must have strong communication skills.
+Nice to have: GCP BigQuery, Pub/Sub, Grafana + Prometheus monitoring, scikit-learn.
+"""
+
+SAMPLE_RESUME = """Software engineer with 4 years of experience.
+• Built REST APIs in Node.js and Python (FastAPI), tested with pytest.
+• Managed PostgreSQL and Redis; wrote dashboards in Power BI and Tableau.
+• Containerized apps using Docker; deployed to Amazon Web Services EC2.
+• Led agile ceremonies, mentoring juniors. Skills: C++, C#, sklearn, TF2, ms excel.
+"""
+
+FILLER = [
+    "team", "experience", "years", "build", "deliver", "customers", "platform", "scalable",
+    "ownership", "impact", "fast", "paced", "environment", "product", "design", "x", "ml", "go",
+    "tests", "testing", "tested", "deployments", "pipelines", "libraries", "quickly", "modeling",
+]
+PUNCT = [".", ",", ";", ":", "!", "?", "(", ")", "/", "-", "&", "+", "#", "'", '"']
+SEPARATORS = [" ", " ", " ", "  ", "\n", "\n- ", "\n• ", ". ", "\r\n", "\t"]
+BOOSTS = [
+    "Required:", "Must have", "Qualifications", "Requirements", "Nice to have", "Preferred",
+    "Responsibilities", "You will", "We are looking",
+]
+SUFFIXES = ["", "", "", "s", "ing", "ed", "ly", "ies"]
+
+def _random_word(rng):
+    pick = rng.random()
+    if pick < 0.30:
+        w = rng.choice(COMMON_SKILLS)
+    elif pick < 0.45:
+        w = rng.choice(list(SKILL_SYNONYMS))
+    elif pick < 0.60:
+        w = rng.choice(sorted(STOPWORDS))
+    elif pick < 0.70:
+        w = rng.choice(BOOSTS)
+    elif pick < 0.80:
+        w = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(1, 3)))
+    else:
+        w = rng.choice(FILLER)
+    w = w + rng.choice(SUFFIXES)
+    if rng.random() < 0.25:
+        w = w.upper() if rng.random() < 0.5 else w.title()
+    if rng.random() < 0.15:
+        w = w + rng.choice(PUNCT)
+    return w
+
+def random_text(rng, max_words=120):
+    n = rng.randint(0, max_words)
+    parts = []
+    for _ in range(n):
+        parts.append(_random_word(rng))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+def generated_cases(n, seed):
+    rng = random.Random(seed)
+    cases = [("", ""), (" ", "\n"), ("-", "."), ("•••", "python"), (SAMPLE_JD, "")]
+    while len(cases) < n:
+        cases.append((random_text(rng, max_words=rng.choice([20, 80, 250])), random_text(rng)))
+    return cases[:n]
+
+def real_cases(db_path):
+    cases = [(SAMPLE_JD, SAMPLE_RESUME), (SAMPLE_RESUME, SAMPLE_JD)]
+    if os.path.exists(db_path):
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            rows = conn.execute("SELECT job_text, resume_text FROM analyses").fetchall()
+            conn.close()
+            cases.extend((jd or "", rs or "") for jd, rs in rows)
+        except sqlite3.Error:
+            pass
+    return cases
+
+# ---- Equivalence ----
+
+def _same_scored(a, b, rel_tol):
+    if len(a) != len(b):
+        return False
+    for (ta, sa), (tb, sb) in zip(a, b):
+        if ta != tb or not math.isclose(sa, sb, rel_tol=rel_tol, abs_tol=0.0):
+            return False
+    return True
+
+def _short(text, limit=160):
+    text = repr(text)
+    return text if len(text) <= limit else text[:limit] + f"... ({len(text)} chars)"
+
+def check_equivalence(cases, rel_tol):
+    failures = []
+    for job, resume in cases:
+        for text in (job, resume):
+            ref = nlp_reference.extract_skills_from_text(text)
+            got = nlp_engine.extract_skills_from_text(text)
+            if ref != got:
+                failures.append(("extract_skills_from_text", text, ref, got))
+            ref = nlp_reference.preprocess_text(text)
+            got = nlp_engine.preprocess_text(text)
+            if ref != got:
+                failures.append(("preprocess_text", text, ref, got))
+            ref = nlp_reference.split_docs(text)
+            got = nlp_engine.split_docs(text)
+            if ref != got:
+                failures.append(("split_docs", text, ref, got))
+
+        for top_k in (30, 48):
+            ref = nlp_reference.tfidf_keywords_weighted(job, top_k=top_k)
+            got = nlp_engine.tfidf_keywords_weighted(job, top_k=top_k)
+            if not _same_scored(ref, got, rel_tol):
+                failures.append((f"tfidf_keywords_weighted(top_k={top_k})", job, ref, got))
+
+        ref = nlp_reference.compare_job_and_resume(job, resume)
+        got = nlp_engine.compare_job_and_resume(job, resume)
+        if ref != got:
+            failures.append(("compare_job_and_resume", (job, resume), ref, got))
+        # Second call must come back from the cache and still match the oracle.
+        for _ in range(2):
+            got = result_cache.cached_compare_job_and_resume(job, resume)
+            if ref != got:
+                failures.append(("cached_compare_job_and_resume", (job, resume), ref, got))
+    return failures
+
+def check_cache_eviction(workdir, max_bytes=200_000):
+    # Going over the size budget must trim only the oldest entries, not wipe the cache.
+    saved = (result_cache.CACHE_DB_NAME, result_cache.CACHE_MAX_BYTES, result_cache._conn, result_cache._writes)
+    result_cache.CACHE_DB_NAME = os.path.join(workdir, "evict.db")
+    result_cache.CACHE_MAX_BYTES = max_bytes
+    result_cache._conn, result_cache._writes = None, 0
+    rng = random.Random(0)
+    try:
+        keys = []
+        for i in range(6 * result_cache.CACHE_EVICT_EVERY + 1):  # ends on an eviction pass
+            key = result_cache.make_key(f"job {i}", "resume")
+            result_cache.cache_put(key, {"job_skills": [f"{rng.getrandbits(64):x}" for _ in range(40)]})
+            keys.append(key)
+        conn = result_cache._get_conn()
+        rows = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        file_bytes = result_cache._file_bytes(conn)
+        survivors = [k for k in keys if result_cache.cache_get(k) is not None]
+        ok = (
+            file_bytes <= max_bytes and 0 < rows < len(keys) and rows >= len(keys) // 4
+            and survivors == keys[-rows:]
+        )
+        got = {"rows": rows, "file_bytes": file_bytes, "newest_rows_kept": survivors == keys[-rows:]}
+        return [] if ok else [("result_cache eviction", f"{len(keys)} writes, budget {max_bytes}", "oldest rows trimmed", got)]
+    finally:
+        result_cache._conn.close()
+        result_cache.CACHE_DB_NAME, result_cache.CACHE_MAX_BYTES, result_cache._conn, result_cache._writes = saved
+
+def check_corpus(cases, workdir):
+    # Scoring through the pre-tokenized corpus must equal scoring the raw resume text.
+    path = os.path.join(workdir, "corpus.rkc")
+    resume_corpus.build_corpus(((str(i), rs) for i, (_, rs) in enumerate(cases)), path)
+    failures = []
+    with resume_corpus.ResumeCorpus(path) as corpus:
+        for i, (_, resume) in enumerate(cases):
+            sentences = nlp_reference.split_docs(resume)
+            ref = ([nlp_reference.tokenize(d) for d in sentences], [nlp_reference.section_weight(d) for d in sentences])
+            got = (corpus.doc_sentences(i), corpus.doc_weights(i))
+            if ref != got:
+                failures.append(("ResumeCorpus.doc_sentences/doc_weights", resume, ref, got))
+
+        for job, _ in cases[:5]:
+            job_side = nlp_engine.analyze_job(job)
+            ranked = {i: (cov, present) for cov, present, i, _ in corpus.rank(job, top_n=len(corpus))}
+            for i, (_, resume) in enumerate(cases):
+                ref = nlp_reference.compare_job_and_resume(job, resume)
+                got = corpus.compare(i, job=job_side)
+                if ref != got:
+                    failures.append(("ResumeCorpus.compare", (job, resume), ref, got))
+                present = len(ref["present_skills"])
+                ref_rank = (present / (len(ref["job_skills"]) or 1), present)
+                if ranked.get(i) != ref_rank:
+                    failures.append(("ResumeCorpus.rank", (job, resume), ref_rank, ranked.get(i)))
+    return failures
+
+# ---- Throughput ----
+
+def _timed_round(cases, parity, min_time):
+    # Interleave at case granularity (alternating which side goes first) and measure process
+    # CPU time, so load from other processes and drift in CPU frequency hit both sides alike.
+    # Full passes repeat until each side has accumulated at least min_time seconds.
+    clock = time.process_time
+    ref = got = 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        while ref < min_time or got < min_time:
+            for i, (job, resume) in enumerate(cases):
+                first_ref = (i + parity) % 2 == 0
+                for use_ref in ((True, False) if first_ref else (False, True)):
+                    fn = nlp_reference.compare_job_and_resume if use_ref else nlp_engine.compare_job_and_resume
+                    t0 = clock()
+                    fn(job, resume)
+                    dt = clock() - t0
+                    if use_ref:
+                        ref += dt
+                    else:
+                        got += dt
+    finally:
+        gc.enable()
+    return ref, got
+
+def check_throughput(cases, rounds, min_time):
+    # The gate uses the median of the per-round ratios, so a few noisy rounds cannot trip it.
+    ref_times, got_times, ratios = [], [], []
+    for r in range(rounds):
+        ref, got = _timed_round(cases, r % 2, min_time)
+        ref_times.append(ref)
+        got_times.append(got)
+        ratios.append(got / ref if ref else 1.0)
+    return statistics.median(ref_times), statistics.median(got_times), statistics.median(ratios), ratios
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the NLP engine against the frozen reference oracle.")
+    parser.add_argument("--cases", type=int, default=100, help="number of generated input pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default="data.db", help="SQLite file with real analyses (read-only)")
+    parser.add_argument("--budget", type=float, default=0.15,
+                        help="max allowed slowdown vs the oracle, as a median ratio (0.15 = 15%% slower)")
+    parser.add_argument("--rounds", type=int, default=7, help="interleaved timing rounds")
+    parser.add_argument("--min-time", type=float, default=1.0, help="minimum CPU seconds per side per round")
+    parser.add_argument("--rel-tol", type=float, default=1e-9, help="relative tolerance for TF-IDF scores")
+    parser.add_argument("--skip-perf", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Never let the harness itself trigger profile captures or touch the app's cache file.
+    profiling.PROFILE_ENABLED = False
+    tmpdir = tempfile.TemporaryDirectory()
+    result_cache.CACHE_DB_NAME = os.path.join(tmpdir.name, "cache.db")
+
+    cases = real_cases(args.db) + generated_cases(args.cases, args.seed)
+    failures = (
+        check_equivalence(cases, args.rel_tol) + check_corpus(cases, tmpdir.name)
+        + check_cache_eviction(tmpdir.name)
+    )
+    print(f"equivalence: {len(cases)} input pairs, {len(failures)} mismatch(es)")
+    for name, inp, ref, got in failures[:10]:
+        print(f"\n  MISMATCH in {name}")
+        print(f"    input:     {_short(inp)}")
+        print(f"    reference: {_short(ref, 400)}")
+        print(f"    engine:    {_short(got, 400)}")
+
+    slow = False
+    if not args.skip_perf:
+        ref_s, got_s, ratio, ratios = check_throughput(cases, args.rounds, args.min_time)
+        slow = ratio > 1.0 + args.budget
+        print(f"throughput: reference {ref_s * 1000:.1f} ms, engine {got_s * 1000:.1f} ms CPU per round, "
+              f"median ratio {ratio:.2f}x (rounds {min(ratios):.2f}-{max(ratios):.2f}x, "
+              f"budget {1.0 + args.budget:.2f}x){'  REGRESSION' if slow else ''}")
+
+    tmpdir.cleanup()
+    return 1 if failures or slow else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
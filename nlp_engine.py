@@ -1,6 +1,13 @@
 import re
+import json
 import math
 import string
+import hashlib
+
+from profiling import profiled
+
+# Bump whenever catalog, synonyms or scoring change so cached results are not reused.
+ENGINE_VERSION = "1"
 
 # ====================== NLP utils (Enhanced, No LLM) ======================
 
@@ -133,6 +140,12 @@ CONTEXT_BOOSTS = [
     (r"\b(responsibilities|you will|we are looking)\b", 1.1),
 ]
 
+# Catalog edits change results too: the result cache and resume corpus files are keyed on
+# this alongside ENGINE_VERSION, so they are invalidated even without a version bump.
+CATALOG_FINGERPRINT = hashlib.sha256(json.dumps([
+    sorted(STOPWORDS), list(COMMON_SKILLS), sorted(SKILL_SYNONYMS.items()), CONTEXT_BOOSTS,
+]).encode("utf-8")).digest()
+
 def preprocess_text(txt: str):
     txt = txt.lower()
     txt = txt.replace("/", " / ")
@@ -194,6 +207,7 @@ def build_token_space(text: str, use_ngrams=True):
         tokens_per_doc.append((grams, section_weight(d)))
     return tokens_per_doc
 
+@profiled("nlp.tfidf_keywords_weighted")
 def tfidf_keywords_weighted(text: str, top_k=30):
     docs_tokens_weighted = build_token_space(text, use_ngrams=True)
     idf = inverse_doc_freq([t for t,_ in docs_tokens_weighted])
@@ -220,6 +234,7 @@ def skill_in_text(text_p: str, skill: str):
     text_tokens = [simple_stem(t) for t in text_p.split()]
     return all(s in text_tokens for s in skill_tokens)
 
+@profiled("nlp.extract_skills_from_text")
 def extract_skills_from_text(text: str):
     text_p = preprocess_text(text)
     found = set()
@@ -231,9 +246,11 @@ def extract_skills_from_text(text: str):
             found.add(canon)
     return sorted(list(found))
 
-def compare_job_and_resume(job_text, resume_text):
+# Job-side half of compare_job_and_resume: depends only on the JD, so it can be
+# computed once and matched against many resumes (see resume_corpus.py).
+@profiled("nlp.analyze_job")
+def analyze_job(job_text):
     job_skills = set(extract_skills_from_text(job_text))
-    resume_skills = set(extract_skills_from_text(resume_text))
 
     jd_kw_scored = tfidf_keywords_weighted(job_text, top_k=48)
     jd_kw_map = {k: v for k, v in jd_kw_scored}
@@ -253,7 +270,9 @@ def compare_job_and_resume(job_text, resume_text):
     }
 
     job_all = job_skills.union(heuristic_terms)
+    return job_all, jd_kw_map
 
+def match_skills(job_all, jd_kw_map, resume_skills):
     missing = job_all - resume_skills
     present = job_all & resume_skills
     extra = resume_skills - job_all
@@ -269,6 +288,12 @@ def compare_job_and_resume(job_text, resume_text):
         "missing_ranked": ranked_missing,
     }
 
+@profiled("nlp.compare_job_and_resume")
+def compare_job_and_resume(job_text, resume_text):
+    job_all, jd_kw_map = analyze_job(job_text)
+    resume_skills = set(extract_skills_from_text(resume_text))
+    return match_skills(job_all, jd_kw_map, resume_skills)
+
 def suggestion_rules(missing_skills):
     suggestions = []
     for skill in missing_skills:
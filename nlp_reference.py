@@ -0,0 +1,146 @@
+import re
+import math
+import string
+
+from nlp_engine import STOPWORDS, COMMON_SKILLS, SKILL_SYNONYMS, CONTEXT_BOOSTS
+
+# ====================== Frozen reference implementation (oracle) ======================
+# Verbatim copy of the original nlp_engine algorithms. Do NOT optimize or "fix" anything
+# here: equivalence_check.py compares the live engine against these functions. The
+# keyword catalogs are shared with nlp_engine on purpose, so only the algorithms are frozen.
+
+def preprocess_text(txt: str):
+    txt = txt.lower()
+    txt = txt.replace("/", " / ")
+    txt = txt.translate(str.maketrans('', '', string.punctuation.replace("/", "")))
+    txt = re.sub(r"\s+", " ", txt)
+    return txt.strip()
+
+def tokenize(txt: str):
+    txt = preprocess_text(txt)
+    return [t for t in txt.split() if t not in STOPWORDS]
+
+def simple_stem(token: str):
+    for suf in ["ing","ed","ly","ies","s"]:
+        if token.endswith(suf) and len(token) > len(suf) + 2:
+            return token[:-len(suf)]
+    return token
+
+def ngrams(tokens, n=2):
+    return [" ".join(tokens[i:i+n]) for i in range(len(tokens)-n+1)]
+
+def split_docs(text: str):
+    parts = re.split(r"[\n\r\u2022\-\•]+|\.", text)
+    docs = [p.strip() for p in parts if p.strip()]
+    return docs or [text.strip()]
+
+def section_weight(sentence: str) -> float:
+    s = sentence.lower()
+    w = 1.0
+    for pat, mul in CONTEXT_BOOSTS:
+        if re.search(pat, s):
+            w *= mul
+    return w
+
+def term_freq(doc_tokens):
+    tf = {}
+    total = len(doc_tokens)
+    if total == 0:
+        return tf
+    for t in doc_tokens:
+        tf[t] = tf.get(t, 0) + 1
+    for t in tf:
+        tf[t] /= total
+    return tf
+
+def inverse_doc_freq(all_docs_tokens):
+    N = len(all_docs_tokens)
+    df = {}
+    for doc in all_docs_tokens:
+        for t in set(doc):
+            df[t] = df.get(t, 0) + 1
+    return {t: (math.log((N + 1) / (d + 1)) + 1) for t, d in df.items()}
+
+def build_token_space(text: str, use_ngrams=True):
+    docs = split_docs(text)
+    tokens_per_doc = []
+    for d in docs:
+        toks = tokenize(d)
+        grams = toks + ngrams(toks,2) + ngrams(toks,3) if use_ngrams else toks
+        tokens_per_doc.append((grams, section_weight(d)))
+    return tokens_per_doc
+
+def tfidf_keywords_weighted(text: str, top_k=30):
+    docs_tokens_weighted = build_token_space(text, use_ngrams=True)
+    idf = inverse_doc_freq([t for t,_ in docs_tokens_weighted])
+    scores = {}
+    for doc_tokens, w in docs_tokens_weighted:
+        tf = term_freq(doc_tokens)
+        for term, tf_val in tf.items():
+            scores[term] = scores.get(term, 0.0) + (tf_val * idf.get(term, 0.0) * w)
+    for term in list(scores.keys()):
+        if len(term) <= 2:
+            scores[term] *= 0.5
+    sorted_terms = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    return [(t, s) for t, s in sorted_terms if t not in STOPWORDS][:top_k]
+
+def normalize_skill(term: str):
+    t = preprocess_text(term)
+    return SKILL_SYNONYMS.get(t, t)
+
+def skill_in_text(text_p: str, skill: str):
+    skill = normalize_skill(skill)
+    if skill in text_p:
+        return True
+    skill_tokens = [simple_stem(t) for t in skill.split()]
+    text_tokens = [simple_stem(t) for t in text_p.split()]
+    return all(s in text_tokens for s in skill_tokens)
+
+def extract_skills_from_text(text: str):
+    text_p = preprocess_text(text)
+    found = set()
+    for skill in COMMON_SKILLS:
+        if skill_in_text(text_p, skill):
+            found.add(normalize_skill(skill))
+    for syn, canon in SKILL_SYNONYMS.items():
+        if skill_in_text(text_p, syn):
+            found.add(canon)
+    return sorted(list(found))
+
+def compare_job_and_resume(job_text, resume_text):
+    job_skills = set(extract_skills_from_text(job_text))
+    resume_skills = set(extract_skills_from_text(resume_text))
+
+    jd_kw_scored = tfidf_keywords_weighted(job_text, top_k=48)
+    jd_kw_map = {k: v for k, v in jd_kw_scored}
+
+    heuristic_terms = {
+        kw for kw, _ in jd_kw_scored
+        if (any(sig in kw for sig in [
+                "python","sql","api","ml","data","learning","cloud","docker","kuber",
+                "pipeline","model","pandas","spark","aws","azure","gcp","react","java",
+                "testing","deployment","analytics","analysis","visualization",
+                "communication","leadership","etl","airflow","kafka","git","ci","cd",
+                "security","monitoring","prometheus","grafana","selenium","cypress",
+                "bigquery","redshift","snowflake","airflow","dbt","kubernetes","terraform",
+                "ansible","helm","istio","vertex","sagemaker","lambda","gke","eks","ecs",
+                "pub","sub","pub/sub"
+            ]) or kw in COMMON_SKILLS)
+    }
+
+    job_all = job_skills.union(heuristic_terms)
+
+    missing = job_all - resume_skills
+    present = job_all & resume_skills
+    extra = resume_skills - job_all
+
+    ranked_missing = sorted(list(missing), key=lambda k: jd_kw_map.get(k, 0.0), reverse=True)
+
+    return {
+        "job_skills": sorted(list(job_all)),
+        "resume_skills": sorted(list(resume_skills)),
+        "missing_skills": sorted(list(missing)),
+        "present_skills": sorted(list(present)),
+        "extra_skills": sorted(list(extra)),
+        "missing_ranked": ranked_missing,
+    }
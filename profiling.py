@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import pstats
+import inspect
+import logging
+import hashlib
+import argparse
+import cProfile
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# ====================== On-demand profiling of slow analyses (opt-in) ======================
+
+PROFILE_ENABLED = os.environ.get("RESUME_PROFILE", "0") == "1"
+PROFILE_THRESHOLD_MS = float(os.environ.get("RESUME_PROFILE_THRESHOLD_MS", "500"))
+PROFILE_DIR = os.environ.get("RESUME_PROFILE_DIR", "profiles")
+PROFILE_COOLDOWN_S = float(os.environ.get("RESUME_PROFILE_COOLDOWN_S", "600"))  # per entry point
+PROFILE_MAX_CAPTURES = int(os.environ.get("RESUME_PROFILE_MAX_CAPTURES", "50"))  # oldest are pruned
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+# tracemalloc is process-global, so only one capture may run at a time.
+_capture_lock = threading.Lock()
+_last_capture = {}
+
+def _describe_text(text: str):
+    # Never store the raw posting/resume: only a digest and size figures.
+    return {
+        "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "chars": len(text),
+        "lines": text.count("\n") + 1 if text else 0,
+        "words": len(text.split()),
+    }
+
+def _describe_inputs(named):
+    return {k: _describe_text(v) if isinstance(v, str) else type(v).__name__ for k, v in named.items()}
+
+def _named_args(sig, args, kwargs):
+    try:
+        return dict(sig.bind(*args, **kwargs).arguments)
+    except TypeError:
+        named = {f"arg{i}": v for i, v in enumerate(args)}
+        named.update(kwargs)
+        return named
+
+def _artifact_base(name: str, inputs: dict):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    return os.path.join(PROFILE_DIR, f"{stamp}-{name}-{digest}")
+
+def _write_meta(base: str, meta: dict):
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    _prune()
+
+def _prune():
+    # Artifact names start with a UTC timestamp, so sorting puts the oldest first.
+    bases = sorted({os.path.splitext(fn)[0] for fn in os.listdir(PROFILE_DIR) if fn.endswith((".json", ".prof"))})
+    for base in bases[:max(0, len(bases) - PROFILE_MAX_CAPTURES)]:
+        for ext in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, base + ext))
+            except FileNotFoundError:
+                pass
+
+def _claim_capture(name: str):
+    # Non-blocking: a request never waits for another thread's capture, and each entry
+    # point captures at most once per cooldown window (per process).
+    if not _capture_lock.acquire(blocking=False):
+        return False
+    now = time.monotonic()
+    last = _last_capture.get(name)
+    if last is not None and now - last < PROFILE_COOLDOWN_S:
+        _capture_lock.release()
+        return False
+    _last_capture[name] = now
+    return True
+
+def _capture(name, fn, args, kwargs, elapsed_ms, inputs):
+    # Re-run the (side-effect free) call under cProfile + tracemalloc. Runs on a
+    # background thread after a call was already slow, so no request waits for it.
+    base = _artifact_base(name, inputs)
+    prof = cProfile.Profile()
+    started_tm = not tracemalloc.is_tracing()
+    if started_tm:
+        tracemalloc.start()
+    _local.capturing = True
+    try:
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            fn(*args, **kwargs)
+        finally:
+            prof.disable()
+        profiled_ms = (time.perf_counter() - t0) * 1000
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        _local.capturing = False
+        if started_tm:
+            tracemalloc.stop()
+    prof.dump_stats(base + ".prof")
+    top_alloc = [
+        {"where": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:10]
+    ]
+    _write_meta(base, {
+        "name": name,
+        "captured_at": datetime.utcnow().isoformat(),
+        "elapsed_ms": round(elapsed_ms, 2),
+        "profiled_ms": round(profiled_ms, 2),
+        "threshold_ms": PROFILE_THRESHOLD_MS,
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "inputs": inputs,
+        "top_alloc": top_alloc,
+        "profile": os.path.basename(base) + ".prof",
+    })
+
+def _capture_in_background(name, fn, args, kwargs, elapsed_ms, inputs):
+    # Holds _capture_lock (taken by _claim_capture) for the whole capture.
+    try:
+        _capture(name, fn, args, kwargs, elapsed_ms, inputs)
+    except Exception:
+        log.exception("profile capture for %s failed", name)
+    finally:
+        _capture_lock.release()
+
+# Capture a cProfile/tracemalloc artifact when a call exceeds the latency threshold.
+# Only the outermost profiled call captures, and the wrapped function must be free
+# of side effects because a slow call is re-run once under the profiler. The re-run
+# happens on a daemon thread; the caller gets its result back immediately.
+def profiled(name: str):
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILE_ENABLED or getattr(_local, "depth", 0) or getattr(_local, "capturing", False):
+                return fn(*args, **kwargs)
+            _local.depth = 1
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                _local.depth = 0
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if elapsed_ms >= PROFILE_THRESHOLD_MS and _claim_capture(name):
+                try:
+                    inputs = _describe_inputs(_named_args(sig, args, kwargs))
+                    threading.Thread(
+                        target=_capture_in_background,
+                        args=(name, fn, args, kwargs, elapsed_ms, inputs),
+                        name=f"profile-capture-{name}",
+                        daemon=True,
+                    ).start()
+                except Exception:
+                    _capture_lock.release()
+                    log.exception("could not start profile capture for %s", name)
+            return result
+        return wrapper
+    return decorator
+
+# Record wall time and input sizes (no profile) for a UI handler block when it is slow.
+# Nested captures run in the background, so they are not part of elapsed_ms.
+@contextmanager
+def slow_request(name: str, **texts):
+    if not PROFILE_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        if elapsed_ms >= PROFILE_THRESHOLD_MS:
+            try:
+                inputs = _describe_inputs(texts)
+                _write_meta(_artifact_base(name, inputs), {
+                    "name": name,
+                    "captured_at": datetime.utcnow().isoformat(),
+                    "elapsed_ms": round(elapsed_ms, 2),
+                    "threshold_ms": PROFILE_THRESHOLD_MS,
+                    "inputs": inputs,
+                })
+            except Exception:
+                log.exception("slow request record for %s failed", name)
+
+# ====================== CLI: summarize captured hotspots ======================
+
+def summarize(directory: str, top: int = 15, out=sys.stdout):
+    metas = []
+    if os.path.isdir(directory):
+        for fn in sorted(os.listdir(directory)):
+            if fn.endswith(".json"):
+                with open(os.path.join(directory, fn), encoding="utf-8") as f:
+                    metas.append(json.load(f))
+    if not metas:
+        print(f"No captures in {directory}", file=out)
+        return
+
+    print(f"{len(metas)} capture(s) in {directory}\n", file=out)
+    for m in sorted(metas, key=lambda m: m["elapsed_ms"], reverse=True)[:top]:
+        sizes = ", ".join(
+            f"{k}={v['chars']}ch/{v['lines']}ln" for k, v in m["inputs"].items() if isinstance(v, dict)
+        )
+        print(f"  {m['elapsed_ms']:>9.1f} ms  {m['name']:<28} {sizes}", file=out)
+
+    profs = [
+        os.path.join(directory, m["profile"]) for m in metas
+        if m.get("profile") and os.path.exists(os.path.join(directory, m["profile"]))
+    ]
+    if profs:
+        print(f"\nTop {top} hotspots across {len(profs)} profile(s) (by cumulative time):", file=out)
+        stats = pstats.Stats(*profs, stream=out)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize captured slow-analysis profiles.")
+    parser.add_argument("directory", nargs="?", default=PROFILE_DIR)
+    parser.add_argument("--top", type=int, default=15, help="number of captures / functions to show")
+    args = parser.parse_args(argv)
+    summarize(args.directory, top=args.top)
+
+if __name__ == "__main__":
+    main()
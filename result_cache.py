@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from nlp_engine import ENGINE_VERSION, CATALOG_FINGERPRINT, compare_job_and_resume
+
+# ====================== Persistent analysis cache (shared by app replicas) ======================
+
+CACHE_DB_NAME = os.environ.get("RESUME_CACHE_DB", "analysis_cache.db")
+CACHE_TTL_SECONDS = int(os.environ.get("RESUME_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.environ.get("RESUME_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_EVICT_EVERY = 64  # run size-based eviction once per this many writes
+
+_conn = None
+_conn_pid = None
+_lock = threading.Lock()
+_writes = 0
+
+def _get_conn():
+    # One connection per process; reopened after fork so replicas never share a handle.
+    global _conn, _conn_pid
+    if _conn is None or _conn_pid != os.getpid():
+        conn = sqlite3.connect(CACHE_DB_NAME, timeout=5.0, check_same_thread=False, isolation_level=None)
+        # Lets eviction hand freed pages back to the OS. Must precede journal_mode=WAL, which
+        # initializes a new file; older files are converted by the VACUUM below.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Rows are stored in insertion order (rowid), so evicting the oldest entries frees
+        # whole pages instead of thinning out pages spread across a hash-ordered table.
+        conn.execute("DROP TABLE IF EXISTS results")  # earlier hash-ordered layout
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                key BLOB NOT NULL UNIQUE,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            try:
+                conn.execute("VACUUM")  # one-off conversion of a file created without auto_vacuum
+            except sqlite3.Error:
+                pass
+        _conn, _conn_pid = conn, os.getpid()
+    return _conn
+
+def make_key(job_text: str, resume_text: str) -> bytes:
+    h = hashlib.sha256()
+    h.update(CATALOG_FINGERPRINT)
+    for part in (ENGINE_VERSION, job_text, resume_text):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.digest()
+
+def _dumps(result: dict) -> bytes:
+    return zlib.compress(json.dumps(result, separators=(",", ":")).encode("utf-8"))
+
+def _loads(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+def cache_get(key: bytes):
+    with _lock:
+        try:
+            row = _get_conn().execute(
+                "SELECT payload, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    if row is None:
+        return None
+    payload, created_at = row
+    if time.time() - created_at > CACHE_TTL_SECONDS:
+        return None
+    try:
+        return _loads(payload)
+    except (zlib.error, ValueError):
+        # Corrupt or truncated row: drop it and recompute.
+        with _lock:
+            try:
+                _get_conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+            except sqlite3.Error:
+                pass
+        return None
+
+def cache_put(key: bytes, result: dict):
+    global _writes
+    payload = _dumps(result)
+    with _lock:
+        try:
+            conn = _get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries(key, payload, size, created_at) VALUES(?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            _writes += 1
+            if _writes % CACHE_EVICT_EVERY == 1:
+                _evict(conn)
+        except sqlite3.Error:
+            pass
+
+def _file_bytes(conn):
+    return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+def _vacuum(conn):
+    # executescript() steps the pragma to completion; execute() frees only one page per call.
+    conn.executescript("PRAGMA incremental_vacuum;")
+
+def _evict(conn):
+    # Rows are in insertion order and every entry lives for the same TTL, so the expired
+    # ones are exactly the oldest ids.
+    expired = conn.execute(
+        "SELECT MAX(id) FROM entries WHERE created_at < ?", (time.time() - CACHE_TTL_SECONDS,)
+    ).fetchone()[0]
+    if expired is not None:
+        conn.execute("DELETE FROM entries WHERE id <= ?", (expired,))
+    _vacuum(conn)
+    file_bytes = _file_bytes(conn)
+    if file_bytes <= CACHE_MAX_BYTES:
+        return
+    # Aim for ~90% of the budget: drop the same share of stored payload bytes as the share of
+    # the file that is over target, oldest rows first, then reclaim the pages once.
+    target = int(CACHE_MAX_BYTES * 0.9)
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    to_free = total * (file_bytes - target) / file_bytes
+    freed = 0
+    last_id = None
+    for row_id, size in conn.execute("SELECT id, size FROM entries ORDER BY id"):
+        if freed >= to_free:
+            break
+        last_id = row_id
+        freed += size
+    if last_id is not None:
+        conn.execute("DELETE FROM entries WHERE id <= ?", (last_id,))
+    _vacuum(conn)
+
+def cache_clear():
+    with _lock:
+        _get_conn().execute("DELETE FROM entries")
+
+def cached_compare_job_and_resume(job_text, resume_text):
+    key = make_key(job_text, resume_text)
+    result = cache_get(key)
+    if result is None:
+        result = compare_job_and_resume(job_text, resume_text)
+        cache_put(key, result)
+    return result
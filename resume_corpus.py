@@ -0,0 +1,312 @@
+import os
+import sys
+import mmap
+import array
+import struct
+import sqlite3
+import argparse
+
+from nlp_engine import (
+    ENGINE_VERSION, CATALOG_FINGERPRINT, COMMON_SKILLS, SKILL_SYNONYMS,
+    split_docs, tokenize, section_weight, normalize_skill,
+    extract_skills_from_text, analyze_job, match_skills,
+)
+
+# ====================== Pre-tokenized, memory-mapped resume corpus ======================
+# Build once with this engine's tokenization and catalog matching, then score any number of
+# JDs against it without touching resume text again. The file is opened with mmap
+# (read-only, shared), so every worker process maps the same page-cache pages.
+#
+# Layout (native byte order, every section 8-byte aligned):
+#   header   : magic, format version, byte-order mark, engine version, catalog fingerprint,
+#              section count. A file is rejected unless both engine fields match this engine.
+#   sections : (offset, length) table, then the sections below
+#     vocab / names / skills : string tables (uint32 offsets[n+1] + utf-8 blob)
+#     tokens                 : uint32 token ids, all documents concatenated
+#     sent_offsets           : uint32[n_sentences+1], start of each sentence in tokens
+#     doc_sent_offsets       : uint32[n_docs+1], first sentence of each document
+#     sent_weights           : float64[n_sentences], section_weight() of each sentence
+#     skill_bitmaps          : uint64[n_docs * words], one skill bitmap per document
+#
+# Scoring (compare/rank) reads only skill_bitmaps: the engine's resume side is just
+# extract_skills_from_text. The token sections are kept so future token-level scoring
+# (e.g. TF-IDF over resumes) can run without a rebuild; doc_sentences() decodes them and
+# equivalence_check.py verifies they match split_docs/tokenize/section_weight.
+
+CORPUS_MAGIC = b"RKOC"
+CORPUS_FORMAT = 2
+_BOM = 0x01020304
+_HEADER = struct.Struct("=4sII16s32sI")
+_SECTION = struct.Struct("=QQ")
+_SECTIONS = [
+    "vocab_offsets", "vocab_blob", "names_offsets", "names_blob", "skills_offsets", "skills_blob",
+    "tokens", "sent_offsets", "doc_sent_offsets", "sent_weights", "skill_bitmaps",
+]
+_TYPECODES = {
+    "vocab_offsets": "I", "names_offsets": "I", "skills_offsets": "I", "tokens": "I",
+    "sent_offsets": "I", "doc_sent_offsets": "I", "sent_weights": "d", "skill_bitmaps": "Q",
+}
+
+def catalog_skills():
+    # Every value extract_skills_from_text can return, in a stable order.
+    return sorted({normalize_skill(s) for s in COMMON_SKILLS} | set(SKILL_SYNONYMS.values()))
+
+def _string_table(strings):
+    offsets = array.array("I", [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+def build_corpus(docs, out_path):
+    # docs: iterable of (name, text). Returns the number of documents written.
+    skills = catalog_skills()
+    skill_index = {s: i for i, s in enumerate(skills)}
+    words = (len(skills) + 63) // 64
+
+    vocab = {}
+    names = []
+    tokens = array.array("I")
+    sent_offsets = array.array("I", [0])
+    doc_sent_offsets = array.array("I", [0])
+    sent_weights = array.array("d")
+    bitmaps = array.array("Q")
+
+    for name, text in docs:
+        names.append(name)
+        for sentence in split_docs(text):
+            for tok in tokenize(sentence):
+                tokens.append(vocab.setdefault(tok, len(vocab)))
+            sent_offsets.append(len(tokens))
+            sent_weights.append(section_weight(sentence))
+        doc_sent_offsets.append(len(sent_weights))
+
+        bits = 0
+        for skill in extract_skills_from_text(text):
+            bits |= 1 << skill_index[skill]
+        bitmaps.extend((bits >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words))
+
+    vocab_offsets, vocab_blob = _string_table(vocab)
+    names_offsets, names_blob = _string_table(names)
+    skills_offsets, skills_blob = _string_table(skills)
+    payloads = [
+        vocab_offsets.tobytes(), vocab_blob, names_offsets.tobytes(), names_blob,
+        skills_offsets.tobytes(), skills_blob, tokens.tobytes(), sent_offsets.tobytes(),
+        doc_sent_offsets.tobytes(), sent_weights.tobytes(), bitmaps.tobytes(),
+    ]
+
+    pos = _HEADER.size + _SECTION.size * len(payloads)
+    table = []
+    for payload in payloads:
+        pos = (pos + 7) & ~7
+        table.append((pos, len(payload)))
+        pos += len(payload)
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(
+            CORPUS_MAGIC, CORPUS_FORMAT, _BOM, ENGINE_VERSION.encode("ascii"), CATALOG_FINGERPRINT, len(payloads)
+        ))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+        for (offset, _), payload in zip(table, payloads):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payload)
+    # Atomic swap so workers that already mapped the old file keep a consistent view.
+    os.replace(tmp_path, out_path)
+    return len(names)
+
+class _StringTable:
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+class ResumeCorpus:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._views = self._map_sections()
+        except Exception:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass
+            self._file.close()
+            raise
+        v = self._views
+        self.vocab = _StringTable(v["vocab_offsets"], v["vocab_blob"])
+        self.names = _StringTable(v["names_offsets"], v["names_blob"])
+        self.skills = _StringTable(v["skills_offsets"], v["skills_blob"])
+        self.tokens = v["tokens"]
+        self.sent_offsets = v["sent_offsets"]
+        self.doc_sent_offsets = v["doc_sent_offsets"]
+        self.sent_weights = v["sent_weights"]
+        self.skill_bitmaps = v["skill_bitmaps"]
+        self._words = (len(self.skills) + 63) // 64
+        self._skill_id = None
+
+    def _map_sections(self):
+        buf = memoryview(self._mm)
+        if len(buf) < _HEADER.size or bytes(buf[:4]) != CORPUS_MAGIC:
+            raise ValueError(f"{self.path} is not a resume corpus")
+        _, fmt, bom, engine, fingerprint, n = _HEADER.unpack_from(buf, 0)
+        if fmt != CORPUS_FORMAT:
+            raise ValueError(f"{self.path} has corpus format {fmt}, expected {CORPUS_FORMAT}; rebuild it")
+        if bom != _BOM:
+            raise ValueError(f"{self.path} was built on a machine with a different byte order")
+        engine = engine.rstrip(b"\0").decode("ascii")
+        if engine != ENGINE_VERSION:
+            raise ValueError(f"{self.path} was built with engine {engine}, current is {ENGINE_VERSION}; rebuild it")
+        # Stopwords, skills, synonyms and boosts determine tokens, weights and bitmap layout.
+        if fingerprint != CATALOG_FINGERPRINT:
+            raise ValueError(f"{self.path} was built with a different keyword catalog; rebuild it")
+        if n != len(_SECTIONS):
+            raise ValueError(f"{self.path} has {n} sections, expected {len(_SECTIONS)}")
+        views = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(buf, _HEADER.size + i * _SECTION.size)
+            view = buf[offset:offset + length]
+            views[name] = view.cast(_TYPECODES[name]) if name in _TYPECODES else view
+        return views
+
+    # Slices taken from the exposed views (e.g. corpus.tokens[0:3]) stay valid after close():
+    # they keep the mapping alive and it is unmapped once the last one is dropped.
+    def close(self):
+        if self._mm is None:
+            return
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+        self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.names)
+
+    def doc_bits(self, i):
+        start = i * self._words
+        bits = 0
+        for w in range(self._words):
+            bits |= self.skill_bitmaps[start + w] << (64 * w)
+        return bits
+
+    def doc_skills(self, i):
+        bits = self.doc_bits(i)
+        out = set()
+        while bits:
+            low = bits & -bits
+            out.add(self.skills[low.bit_length() - 1])
+            bits ^= low
+        return out
+
+    def doc_weights(self, i):
+        return list(self.sent_weights[self.doc_sent_offsets[i]:self.doc_sent_offsets[i + 1]])
+
+    def doc_sentences(self, i):
+        # Token lists per sentence, decoded from the interned ids.
+        out = []
+        for s in range(self.doc_sent_offsets[i], self.doc_sent_offsets[i + 1]):
+            ids = self.tokens[self.sent_offsets[s]:self.sent_offsets[s + 1]]
+            out.append([self.vocab[t] for t in ids])
+        return out
+
+    def job_mask(self, job_all):
+        if self._skill_id is None:
+            self._skill_id = {self.skills[i]: i for i in range(len(self.skills))}
+        mask = 0
+        for skill in job_all:
+            idx = self._skill_id.get(skill)
+            if idx is not None:
+                mask |= 1 << idx
+        return mask
+
+    # Same result as compare_job_and_resume(job_text, <document i text>).
+    def compare(self, i, job_text=None, job=None):
+        job_all, jd_kw_map = job if job is not None else analyze_job(job_text)
+        return match_skills(job_all, jd_kw_map, self.doc_skills(i))
+
+    # (coverage, present, doc index, name) for the best matching documents. The JD is
+    # analyzed once; each resume costs only a bitmap AND + popcount.
+    def rank(self, job_text, top_n=20):
+        job_all, _ = analyze_job(job_text)
+        mask = self.job_mask(job_all)
+        total = len(job_all) or 1
+        ranked = []
+        for i in range(len(self)):
+            present = bin(self.doc_bits(i) & mask).count("1")
+            ranked.append((present / total, present, i))
+        ranked.sort(key=lambda r: (-r[0], r[2]))
+        return [(cov, present, i, self.names[i]) for cov, present, i in ranked[:top_n]]
+
+# ====================== CLI ======================
+
+def _iter_text_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for fn in sorted(os.listdir(path)):
+                if fn.endswith(".txt"):
+                    yield os.path.join(path, fn)
+        else:
+            yield path
+
+def _docs_from_files(paths):
+    for path in _iter_text_files(paths):
+        with open(path, encoding="utf-8") as f:
+            yield os.path.basename(path), f.read()
+
+def _docs_from_db(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    rows = conn.execute("SELECT id, resume_text FROM analyses ORDER BY id").fetchall()
+    conn.close()
+    for aid, text in rows:
+        yield f"analysis-{aid}", text or ""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or score a pre-tokenized resume corpus.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="convert resume .txt files (or data.db) into a corpus file")
+    b.add_argument("out")
+    b.add_argument("inputs", nargs="*", help=".txt files or directories of .txt files")
+    b.add_argument("--from-db", help="use resume_text from the analyses table of this SQLite file")
+    s = sub.add_parser("score", help="rank the corpus against a job description file")
+    s.add_argument("corpus")
+    s.add_argument("job_file")
+    s.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        if not args.inputs and not args.from_db:
+            parser.error("build needs input files/directories or --from-db")
+        docs = _docs_from_db(args.from_db) if args.from_db else _docs_from_files(args.inputs)
+        n = build_corpus(docs, args.out)
+        print(f"wrote {n} document(s) to {args.out}")
+        return 0
+
+    with open(args.job_file, encoding="utf-8") as f:
+        job_text = f.read()
+    with ResumeCorpus(args.corpus) as corpus:
+        for cov, present, _, name in corpus.rank(job_text, top_n=args.top):
+            print(f"{cov:6.1%}  {present:>3}  {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())